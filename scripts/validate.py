@@ -6,8 +6,22 @@ import subprocess
 import shutil
 import sys
 from pathlib import Path
+from typing import Optional
 import base64
 import hashlib
+import mmap
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # orjson is much faster than stdlib json and works on bytes directly
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    # stdlib json.loads accepts bytes as well (3.6+)
+    json_loads = json.loads
+
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
 
 
 def run(cmd_args):
@@ -28,10 +42,15 @@ def run(cmd_args):
         )
 
 
-def find_cdf_path(explicit: str) -> Path:
+# Directories never searched when auto-detecting cdf-meta.json
+SEARCH_SKIP_DIRS = {'.git', '.venv', 'node_modules', '__pycache__'}
+
+
+def find_cdf_path(explicit: str) -> Optional[Path]:
     """Resolve the CDF pattern root.
     - If explicit path provided and contains cdf-meta.json, use it.
     - Else, search repo for first cdf-meta.json and use its parent.
+    Returns None when no pattern root is found.
     """
     if explicit:
         p = Path(explicit)
@@ -40,38 +59,149 @@ def find_cdf_path(explicit: str) -> Path:
         # allow passing file directly
         if p.is_file() and p.name == 'cdf-meta.json':
             return p.parent
-        return Path('')
-    for meta in Path('.').rglob('cdf-meta.json'):
-        return meta.parent
-    return Path('')
+        return None
+    # Breadth-first so the match nearest the repo root wins and we stop early
+    queue = deque(['.'])
+    while queue:
+        top = queue.popleft()
+        try:
+            with os.scandir(top) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name == 'cdf-meta.json' and entry.is_file():
+                return Path(entry.path).parent
+        for entry in entries:
+            if entry.name in SEARCH_SKIP_DIRS:
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                queue.append(entry.path)
+    return None
+
+
+def walk_once(cdf_path: Path) -> dict:
+    """Walk the CDF tree a single time with os.scandir, skipping .git.
+    Returns {path relative to cdf_path: DirEntry} for every file and directory,
+    in os.walk (top-down) order. Callers filter this instead of re-walking.
+    """
+    entries = {}
 
+    def _walk(top, rel):
+        try:
+            with os.scandir(top) as it:
+                children = list(it)
+        except OSError:
+            return
+        subdirs = []
+        for entry in children:
+            if entry.name == '.git':
+                continue
+            rel_path = rel / entry.name
+            entries[rel_path] = entry
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append((entry.path, rel_path))
+        for top, rel_path in subdirs:
+            _walk(top, rel_path)
 
-def list_tf_files(cdf_path: Path):
+    _walk(str(cdf_path), Path())
+    return entries
+
+
+def list_tf_files(tree: dict):
     """List Terraform files to check authorization (match old behavior):
     We look for cdf-main.tf under stable/ and unstable/ service directories.
     """
     results = []
-    for root, _, files in os.walk(cdf_path):
-        if '.git' in root:
-            continue
-        if not (('/stable/' in root) or ('/unstable/' in root)):
+    for rel, entry in tree.items():
+        if entry.name != 'cdf-main.tf' or not entry.is_file():
             continue
-        for name in files:
-            if name == 'cdf-main.tf':
-                results.append((Path(root) / name).relative_to(cdf_path))
+        # Compare whole directory components: separator-agnostic, no substring hits
+        dirs = rel.parts[:-1]
+        if 'stable' in dirs or 'unstable' in dirs:
+            results.append(rel)
     return results
 
 
-def sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
-    with open(path, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b''):
+# Opt-in (--use-hash-cache) cache of verified hashes, stored under $RUNNER_TEMP
+HASH_CACHE_NAME = '.cdf_hash_cache.json'
+
+# 4 MiB reads: large enough to amortize per-call overhead and let
+# hash.update release the GIL
+HASH_CHUNK_SIZE = 1 << 22
+# Files below this size are hashed from a single read-only mapping
+MMAP_HASH_MAX_SIZE = 16 * 1024 * 1024
+
+
+# Streaming digest for large files, picked once at import
+if hasattr(hashlib, 'file_digest'):
+    def sha256_stream(f) -> str:
+        # Python 3.11+: read/update loop runs in C
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+else:
+    def sha256_stream(f) -> str:
+        h = hashlib.sha256()
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
             h.update(chunk)
-    return h.hexdigest()
+        return h.hexdigest()
+
+
+def sha256_file(path: Path) -> str:
+    # Unbuffered: we do our own large reads, so skip BufferedReader's copy
+    with open(path, 'rb', buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if 0 < size < MMAP_HASH_MAX_SIZE:
+            # Small files: map once and hash in a single call, no read loop.
+            # Some filesystems (e.g. FUSE mounts) refuse mmap; stream instead.
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                    return hashlib.sha256(m).hexdigest()
+            except (OSError, ValueError):
+                pass
+        return sha256_stream(f)
+
+
+def stat_key(st) -> list:
+    """Identity of a file for the hash cache. ctime cannot be set with utime,
+    and inode/device change when a path is replaced or re-pointed.
+    """
+    return [st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns]
+
+
+def load_hash_cache(cache_file: Path, fingerprint: str) -> dict:
+    """Load {name: {stat, sha256}} from a previous verified run.
+    Returns an empty cache if the file is missing, unreadable, or was written
+    for a different cdf-meta.json / pattern root (fingerprint mismatch).
+    """
+    try:
+        data = json_loads(cache_file.read_bytes())
+    except Exception:
+        return {}
+    if not isinstance(data, dict) or data.get('fingerprint') != fingerprint:
+        return {}
+    files = data.get('files')
+    return files if isinstance(files, dict) else {}
+
+
+def save_hash_cache(cache_file: Path, fingerprint: str, files: dict):
+    try:
+        cache_file.write_bytes(json_dumps({'fingerprint': fingerprint, 'files': files}))
+    except Exception as e:
+        print(f"Failed to write hash cache: {e}")
+
+
+# Top-level keys every in-toto attestation statement must carry
+ATTESTATION_REQUIRED_FIELDS = ("_type", "subject", "predicateType", "predicate")
+
+# Resolved once per process; also used as argv[0] so each verification skips
+# the PATH search
+COSIGN_PATH = shutil.which('cosign')
+# Concurrent cosign processes; each one is a full Go runtime plus key load
+COSIGN_MAX_WORKERS = min(8, os.cpu_count() or 4)
 
 
 def is_cosign_available() -> bool:
-    return shutil.which('cosign') is not None
+    return COSIGN_PATH is not None
 
 
 def main():
@@ -84,19 +214,22 @@ def main():
     ap.add_argument('--cert-issuer-regex', default='.*')
     ap.add_argument('--insecure-ignore-tlog', default='true')
     ap.add_argument('--public-key', default='')
+    ap.add_argument('--use-hash-cache', default='false')
     args = ap.parse_args()
+    fail_on_unauthorized_tf = args.fail_on_unauthorized_tf.lower() == 'true'
+    skip_signature_validation = args.skip_signature_validation.lower() == 'true'
+    insecure_ignore_tlog = args.insecure_ignore_tlog.lower() == 'true'
+    use_hash_cache = args.use_hash_cache.lower() == 'true'
 
     cdf_path = find_cdf_path(args.cdf_path)
-    if not cdf_path or not cdf_path.exists():
+    if cdf_path is None or not cdf_path.exists():
         print('No CDF path found to validate', flush=True)
         # emit outputs
         print('validation_status=skipped')
         print('error_count=0')
         print('file_count=0')
         with open(os.environ.get('GITHUB_OUTPUT', '/dev/null'), 'a') as f:
-            f.write('validation_status=skipped\n')
-            f.write('error_count=0\n')
-            f.write('file_count=0\n')
+            f.write('validation_status=skipped\nerror_count=0\nfile_count=0\n')
         sys.exit(0)
 
     unauthorized_errors = 0
@@ -105,15 +238,19 @@ def main():
     # Load metadata if present
     meta_path = cdf_path / 'cdf-meta.json'
     meta = {}
+    meta_bytes = b''
     if meta_path.exists():
         try:
-            meta = json.loads(meta_path.read_text())
+            meta_bytes = meta_path.read_bytes()
+            meta = json_loads(meta_bytes)
         except Exception as e:
             print(f"❌ Invalid cdf-meta.json: {e}")
             unauthorized_errors += 1
 
+    tree = walk_once(cdf_path)
+
     # Count CDF files by naming convention for reporting
-    file_count = len(list(cdf_path.rglob('*cdf*')))
+    file_count = sum(1 for entry in tree.values() if 'cdf' in entry.name)
 
     # If metadata lists files, use those for integrity/signature checks
     meta_files = set()
@@ -124,12 +261,15 @@ def main():
                 meta_files.add(name)
 
         # Old behavior: Only check Terraform files "authorized"; do not fail on extra CDF files
-        if args.fail_on_unauthorized_tf.lower() == 'true':
-            tf_files = list_tf_files(cdf_path)
+        if fail_on_unauthorized_tf:
+            tf_files = list_tf_files(tree)
             for tf in tf_files:
                 print(f"✅ Authorized TF file: {tf}")
 
         # Hash verification
+        # Each name is hashed once; repeated entries must agree on the hash
+        expected_by_name = {}
+        conflicting = set()
         for f in meta['files']:
             name = f.get('name')
             expected = f.get('sha256')
@@ -138,17 +278,69 @@ def main():
             # Do not verify the hash of cdf-meta.json itself or placeholder values
             if name == 'cdf-meta.json' or expected.startswith('placeholder_'):
                 continue
+            prev = expected_by_name.setdefault(name, expected)
+            if prev != expected and name not in conflicting:
+                print(f"❌ Conflicting hashes in cdf-meta.json for {name}")
+                conflicting.add(name)
+                unauthorized_errors += 1
+
+        # Opt-in only: skip re-hashing files whose stat identity matches a
+        # previous verified run in the same job (requires RUNNER_TEMP).
+        runner_temp = os.environ.get('RUNNER_TEMP', '')
+        cache_file = None
+        fingerprint = ''
+        hash_cache = {}
+        if use_hash_cache and runner_temp:
+            cache_file = Path(runner_temp) / HASH_CACHE_NAME
+            fingerprint = hashlib.sha256(
+                str(cdf_path.resolve()).encode() + b'\0' + meta_bytes).hexdigest()
+            hash_cache = load_hash_cache(cache_file, fingerprint)
+
+        to_check = []
+        for name, expected in expected_by_name.items():
+            if name in conflicting:
+                continue
             p = cdf_path / name
-            if not p.exists():
+            entry = tree.get(Path(name))
+            exists = entry.is_file() if entry is not None else p.is_file()
+            st = None
+            if exists and cache_file:
+                st = entry.stat() if entry is not None else p.stat()
+            to_check.append((name, expected, p if exists else None, st))
+
+        def hash_item(item):
+            """Return (sha256, from_cache) for one metadata entry."""
+            name, expected, p, st = item
+            if p is None:
+                return None, False
+            cached = hash_cache.get(name)
+            if (st is not None and isinstance(cached, dict)
+                    and cached.get('sha256') == expected
+                    and cached.get('stat') == stat_key(st)):
+                return expected, True
+            return sha256_file(p), False
+
+        # Hash files concurrently; report in metadata order for stable logs
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+            hashes = list(ex.map(hash_item, to_check))
+        verified = {}
+        for (name, expected, p, st), (actual, from_cache) in zip(to_check, hashes):
+            if p is None:
                 print(f"⚠️ Missing file listed in metadata: {name}")
                 unauthorized_errors += 1
                 continue
-            actual = sha256_file(p)
             if actual != expected:
                 print(f"❌ Hash mismatch for {name}: expected {expected}, got {actual}")
                 unauthorized_errors += 1
             else:
-                print(f"✅ Hash matches for {name}")
+                if from_cache:
+                    print(f"✅ Hash matches for {name} (cached, unchanged since last verified run)")
+                else:
+                    print(f"✅ Hash matches for {name}")
+                if st is not None:
+                    verified[name] = {'stat': stat_key(st), 'sha256': actual}
+        if cache_file:
+            save_hash_cache(cache_file, fingerprint, verified)
 
         # Prepare public key content (input > env > repo file)
         key_content = args.public_key
@@ -182,7 +374,7 @@ def main():
                 print(f"Failed to write public key: {e}")
 
         # Signature verification with cosign over attestation JSONs
-        if args.skip_signature_validation.lower() != 'true':
+        if not skip_signature_validation:
             if not is_cosign_available():
                 print('❌ cosign not available; signature validation required but tool missing')
                 signature_errors += 1
@@ -190,47 +382,70 @@ def main():
                 # Enumerate all attestation JSONs, validate structure, and verify signatures
                 attested_total = 0
                 attested_passed = 0
-                for att in sorted(cdf_path.rglob('*.attestation.json')):
+                jobs = []
+                # Per-run invariant parts of the cosign command line
+                cert_regex_args = [
+                    "--certificate-identity-regexp", args.cert_identity_regex,
+                    "--certificate-oidc-issuer-regexp", args.cert_issuer_regex,
+                ]
+                tlog_args = ["--insecure-ignore-tlog"] if insecure_ignore_tlog else []
+                if pubkey_file is not None and pubkey_file.exists():
+                    key_args = ["--key", str(pubkey_file)]
+                else:
+                    key_args = []
+                # Flags shared by every verification, in cosign argument order
+                trailing_args = tlog_args + key_args
+                # One pass over the cached walk: sibling .sig/.cert lookups hit
+                # all_files instead of stat(), attestations matched on entry name
+                all_files = set()
+                attestations = []
+                for rel, entry in tree.items():
+                    if not entry.is_file():
+                        continue
+                    all_files.add(cdf_path / rel)
+                    if entry.name.endswith('.attestation.json'):
+                        attestations.append(rel)
+                attestations.sort()
+                for rel in attestations:
+                    att = cdf_path / rel
                     attested_total += 1
-                    print(f"🔁Validating attestation: {att.relative_to(cdf_path)}")
+                    print(f"🔁Validating attestation: {rel}")
                     try:
-                        obj = json.loads(att.read_text())
-                        for req in ["_type", "subject", "predicateType", "predicate"]:
+                        obj = json_loads(att.read_bytes())
+                        for req in ATTESTATION_REQUIRED_FIELDS:
                             if req not in obj:
-                                print(f"❌ Attestation missing field {req}: {att.relative_to(cdf_path)}")
+                                print(f"❌ Attestation missing field {req}: {rel}")
                                 signature_errors += 1
                             else:
                                 print(f"✅ Found required attestation field: {req}")
                     except Exception as e:
-                        print(f"⚠️ Invalid attestation JSON {att.relative_to(cdf_path)}: {e}")
+                        print(f"⚠️ Invalid attestation JSON {rel}: {e}")
                         signature_errors += 1
                         continue
                     sig = att.with_suffix('.sig')
                     cert = att.with_suffix('.cert')
-                    if not sig.exists():
-                        print(f"Signature file missing for attestation: {att.relative_to(cdf_path)}")
+                    if sig not in all_files:
+                        print(f"Signature file missing for attestation: {rel}")
                         signature_errors += 1
                         continue
-                    cmd_parts = ["cosign", "verify-blob", "--signature", str(sig)]
-                    if cert.exists():
-                        cmd_parts += [
-                            "--certificate", str(cert),
-                            "--certificate-identity-regexp", args.cert_identity_regex,
-                            "--certificate-oidc-issuer-regexp", args.cert_issuer_regex,
-                        ]
-                    if args.insecure_ignore_tlog.lower() == 'true':
-                        cmd_parts += ["--insecure-ignore-tlog"]
-                    if pubkey_file and pubkey_file.exists():
-                        cmd_parts += ["--key", str(pubkey_file)]
+                    cmd_parts = [COSIGN_PATH, "verify-blob", "--signature", str(sig)]
+                    if cert in all_files:
+                        cmd_parts += ["--certificate", str(cert)] + cert_regex_args
+                    cmd_parts += trailing_args
                     cmd_parts.append(str(att))
-                    res = run(cmd_parts)
+                    jobs.append((rel, cmd_parts))
+
+                # Each cosign invocation is an independent subprocess; run them
+                # concurrently and report in attestation order
+                with ThreadPoolExecutor(max_workers=COSIGN_MAX_WORKERS) as ex:
+                    results = list(ex.map(run, [parts for _, parts in jobs]))
+                for (rel, _), res in zip(jobs, results):
                     if res.returncode != 0:
-                        rel = att.relative_to(cdf_path)
                         print(f"Signature verification failed for {rel}:\n{res.stdout}")
                         signature_errors += 1
                     else:
                         attested_passed += 1
-                        print(f"✅ Cosign verification passed: {att.relative_to(cdf_path)}")
+                        print(f"✅ Cosign verification passed: {rel}")
 
                 # Summary
                 print(f"Cosign verified {attested_passed}/{attested_total} attestation(s)")
@@ -242,9 +457,11 @@ def main():
     out = os.environ.get('GITHUB_OUTPUT', '')
     if out:
         with open(out, 'a') as f:
-            f.write(f'validation_status={status}\n')
-            f.write(f'error_count={total_errors}\n')
-            f.write(f'file_count={file_count}\n')
+            f.write(
+                f'validation_status={status}\n'
+                f'error_count={total_errors}\n'
+                f'file_count={file_count}\n'
+            )
     else:
         print(f'validation_status={status}')
         print(f'error_count={total_errors}')
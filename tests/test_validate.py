@@ -0,0 +1,133 @@
+import hashlib
+import json
+import mmap
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+SCRIPTS = Path(__file__).resolve().parent.parent / 'scripts'
+sys.path.insert(0, str(SCRIPTS))
+
+import validate  # noqa: E402
+
+
+class FindCdfPathTest(unittest.TestCase):
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        os.chdir(self.root)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_not_found_returns_none(self):
+        (self.root / 'src').mkdir()
+        self.assertIsNone(validate.find_cdf_path(''))
+        self.assertIsNone(validate.find_cdf_path('missing'))
+
+    def test_finds_meta_under_dot_directory(self):
+        (self.root / '.cdf').mkdir()
+        (self.root / '.cdf' / 'cdf-meta.json').write_text('{}')
+        self.assertEqual(validate.find_cdf_path(''), Path('.cdf'))
+
+    def test_skips_blocklisted_directories(self):
+        (self.root / 'node_modules' / 'pkg').mkdir(parents=True)
+        (self.root / 'node_modules' / 'pkg' / 'cdf-meta.json').write_text('{}')
+        self.assertIsNone(validate.find_cdf_path(''))
+
+    def test_not_found_reports_skipped(self):
+        env = dict(os.environ)
+        env.pop('GITHUB_OUTPUT', None)
+        res = subprocess.run(
+            [sys.executable, str(SCRIPTS / 'validate.py'), '--cdf-path', 'missing'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            env=env,
+        )
+        self.assertEqual(res.returncode, 0)
+        self.assertIn('validation_status=skipped', res.stdout)
+
+
+class Sha256FileTest(unittest.TestCase):
+    def test_falls_back_when_mmap_is_refused(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'blob'
+            path.write_bytes(b'cdf' * 1000)
+            want = hashlib.sha256(b'cdf' * 1000).hexdigest()
+            with mock.patch.object(mmap, 'mmap', side_effect=OSError('no mmap')):
+                self.assertEqual(validate.sha256_file(path), want)
+
+
+class HashCacheTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name) / 'pattern'
+        self.runner_temp = Path(self._tmp.name) / 'runner'
+        self.root.mkdir()
+        self.runner_temp.mkdir()
+        self.blob = self.root / 'a.txt'
+        self.blob.write_bytes(b'AAAA')
+        self.write_meta([{'name': 'a.txt', 'sha256': hashlib.sha256(b'AAAA').hexdigest()}])
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write_meta(self, files):
+        (self.root / 'cdf-meta.json').write_text(json.dumps({'files': files}))
+
+    def validate(self, use_cache='true'):
+        env = dict(os.environ, RUNNER_TEMP=str(self.runner_temp))
+        env.pop('GITHUB_OUTPUT', None)
+        return subprocess.run(
+            [sys.executable, str(SCRIPTS / 'validate.py'),
+             '--cdf-path', str(self.root),
+             '--skip-signature-validation', 'true',
+             '--use-hash-cache', use_cache],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            env=env,
+        )
+
+    def test_second_run_uses_cache(self):
+        first = self.validate()
+        self.assertNotIn('(cached', first.stdout)
+        second = self.validate()
+        self.assertEqual(second.returncode, 0)
+        self.assertIn('✅ Hash matches for a.txt (cached', second.stdout)
+
+    def test_same_size_rewrite_with_restored_mtime_is_rehashed(self):
+        self.validate()
+        st = os.stat(self.blob)
+        self.blob.write_bytes(b'ZZZZ')
+        os.utime(self.blob, ns=(st.st_atime_ns, st.st_mtime_ns))
+        res = self.validate()
+        self.assertEqual(res.returncode, 1)
+        self.assertIn('❌ Hash mismatch for a.txt', res.stdout)
+
+    def test_metadata_change_discards_cache(self):
+        self.validate()
+        self.write_meta([
+            {'name': 'a.txt', 'sha256': hashlib.sha256(b'AAAA').hexdigest()},
+            {'name': 'b.txt', 'sha256': 'placeholder_b'},
+        ])
+        res = self.validate()
+        self.assertEqual(res.returncode, 0)
+        self.assertIn('✅ Hash matches for a.txt', res.stdout)
+        self.assertNotIn('(cached', res.stdout)
+
+    def test_disabled_by_default_writes_no_cache(self):
+        self.validate(use_cache='false')
+        self.validate(use_cache='false')
+        self.assertFalse((self.runner_temp / validate.HASH_CACHE_NAME).exists())
+
+
+if __name__ == '__main__':
+    unittest.main()